@@ -4,10 +4,15 @@ PrintLooper - Automate multiple 3D prints by looping GCODE files
 Supports Centauri Carbon and Ender 3 V3 SE printers
 """
 
+import argparse
+import errno
+import functools
+import io
+import mmap
 import os
+import re
 import sys
-from pathlib import Path
-from typing import List, Optional
+from typing import Dict, List, Optional
 
 
 class PrintLooper:
@@ -52,27 +57,65 @@ class PrintLooper:
             ""
         ]
     }
-    
+
+    # Pre-joined push-off blocks, built once at class-definition time so the
+    # hot path is just a dict lookup and a single write
+    _PUSH_OFF_BLOCKS = {
+        printer: "\n".join(lines) + "\n"
+        for printer, lines in PUSH_OFF_SEQUENCES.items()
+    }
+
+    # Output header boilerplate, formatted in a single pass per run
+    _HEADER_TMPL = (
+        "; ================================================================\n"
+        "; PrintLooper - Looped GCODE for %s\n"
+        "; Primary file: %s\n"
+        "%s"
+        "; Loop count: %d\n"
+        "; ================================================================\n"
+        "\n"
+    )
+    _HEADER_ALT_TMPL = (
+        "; Secondary file: %s\n"
+        "; Mode: Alternating between files\n"
+    )
+
     def __init__(self):
         self.printer_mode: Optional[str] = None
         self.gcode_file: Optional[str] = None
         self.gcode_file2: Optional[str] = None  # Second file for alternating
         self.loop_count: int = 1
+        self.output_file: Optional[str] = None  # Optional override of the derived name
+        self._gcode_cache: Optional[List[str]] = None  # Cached directory scan
+        self._file_sizes: Dict[str, int] = {}  # Sizes gathered during the scan
+        self._menu_cache: Optional[List[str]] = None  # Rendered file-menu lines
     
     def find_gcode_files(self) -> List[str]:
         """Find all GCODE files in the current directory"""
-        current_dir = Path.cwd()
-        gcode_files = []
-        
-        for file in current_dir.glob("*.gcode"):
-            if file.is_file():
-                gcode_files.append(file.name)
-        
-        for file in current_dir.glob("*.GCODE"):
-            if file.is_file() and file.name not in gcode_files:
-                gcode_files.append(file.name)
-        
-        return sorted(gcode_files)
+        # Directory contents can't change between prompts in this program,
+        # so scan once and reuse the result across both file selectors
+        if self._gcode_cache is not None:
+            return self._gcode_cache
+
+        # One scandir pass covers both .gcode and .GCODE and gathers sizes
+        # alongside the names; DirEntry.stat() is served from the directory
+        # read on POSIX, so the display loops need no per-file stat() calls
+        with os.scandir('.') as entries:
+            for entry in entries:
+                if entry.is_file() and entry.name.lower().endswith('.gcode'):
+                    self._file_sizes[entry.name] = entry.stat().st_size
+
+        self._gcode_cache = sorted(self._file_sizes)
+        return self._gcode_cache
+
+    def _file_menu(self) -> List[str]:
+        """Rendered file-menu lines, built once and shared by both prompts"""
+        if self._menu_cache is None:
+            self._menu_cache = [
+                f"  {idx}. {name} ({self._file_sizes[name] / 1024:.1f} KB)"
+                for idx, name in enumerate(self.find_gcode_files(), 1)
+            ]
+        return self._menu_cache
     
     def select_printer_mode(self) -> bool:
         """Prompt user to select printer mode"""
@@ -99,15 +142,14 @@ class PrintLooper:
         
         if not gcode_files:
             print("\n✗ No GCODE files found in the current directory!")
-            print(f"Current directory: {Path.cwd()}")
+            print(f"Current directory: {os.getcwd()}")
             return False
         
         print("\n" + "-"*50)
         print("Available GCODE files:")
         print("-"*50)
-        for idx, filename in enumerate(gcode_files, 1):
-            file_size = Path(filename).stat().st_size / 1024  # KB
-            print(f"  {idx}. {filename} ({file_size:.1f} KB)")
+        for menu_line in self._file_menu():
+            print(menu_line)
         print()
         
         while True:
@@ -139,13 +181,11 @@ class PrintLooper:
             return True
         
         print("Available files:")
-        for idx, filename in enumerate(gcode_files, 1):
+        for filename, menu_line in zip(gcode_files, self._file_menu()):
             if filename == self.gcode_file:
-                file_size = Path(filename).stat().st_size / 1024
-                print(f"  {idx}. {filename} ({file_size:.1f} KB) [SELECTED AS FILE 1]")
+                print(f"{menu_line} [SELECTED AS FILE 1]")
             else:
-                file_size = Path(filename).stat().st_size / 1024
-                print(f"  {idx}. {filename} ({file_size:.1f} KB)")
+                print(menu_line)
         print()
         
         while True:
@@ -192,10 +232,216 @@ class PrintLooper:
             except ValueError:
                 print("Invalid input. Please enter a number.")
     
+    # End-of-print markers (heating/fan off commands or end comments) matched
+    # with a single compiled pattern instead of one substring scan per marker
+    _END_RE = re.compile(rb'M104 S0|M140 S0|M106 S0|;\s*END GCODE', re.IGNORECASE)
+    _END_RE_TEXT = re.compile(r'M104 S0|M140 S0|M106 S0|;\s*END GCODE', re.IGNORECASE)
+
+    # End markers always sit near the end of the file, so only the tail
+    # needs to be searched
+    _TAIL_SCAN_BYTES = 64 * 1024
+    _TAIL_SCAN_LINES = 2000
+
+    def _split_gcode(self, filename: str) -> Optional[tuple]:
+        """Split a GCODE file into main body and end sequence.
+
+        Only the file tail is read; the main body stays on disk and is
+        described by its byte length. Returns (cut, end_bytes) where cut is
+        the byte offset at which the end GCODE sequence starts, or None on
+        error.
+        """
+        try:
+            stat = os.stat(filename)
+            if stat.st_size == 0:
+                print(f"\n✗ Error reading file: {filename} is empty")
+                return None
+            # The stat fields key the cache: repeat runs on an unchanged
+            # file skip the tail read and scan entirely
+            return self._split_at_end(filename, stat.st_mtime_ns, stat.st_size)
+        except Exception as e:
+            print(f"\n✗ Error reading file: {e}")
+            return None
+
+    @staticmethod
+    @functools.lru_cache(maxsize=8)
+    def _split_at_end(path: str, mtime_ns: int, size: int) -> tuple:
+        """Tail-scan a file for its end sequence, cached on (path, mtime, size)"""
+        with open(path, 'rb') as f:
+            tail_start = max(0, size - PrintLooper._TAIL_SCAN_BYTES)
+            f.seek(tail_start)
+            tail = f.read()
+
+        # The end sequence starts at the last line containing any marker
+        last = None
+        for last in PrintLooper._END_RE.finditer(tail):
+            pass
+        if last is not None:
+            rel = tail.rfind(b'\n', 0, last.start()) + 1
+        else:
+            # If no end sequence found, treat the last 20 lines as the end
+            rel = len(tail)
+            for _ in range(20):
+                newline = tail.rfind(b'\n', 0, rel - 1)
+                if newline == -1:
+                    rel = 0
+                    break
+                rel = newline + 1
+
+        return tail_start + rel, tail[rel:]
+
+    def _iter_output(self, header: bytes, src, cut: int, src2, cut2,
+                     push_off_block: bytes, end_bytes: bytes):
+        """Yield the output as literal byte chunks and (source, length) copies.
+
+        The writer consumes this stream directly; only per-loop metadata is
+        ever materialized, never the print body itself.
+        """
+        yield header
+
+        for loop_num in range(1, self.loop_count + 1):
+            # Determine which file to use for this loop
+            if self.gcode_file2:
+                # Alternate between files: odd loops use file1, even loops use file2
+                if loop_num % 2 == 1:  # Odd loop number
+                    current_src, current_cut = src, cut
+                    current_file = self.gcode_file
+                else:  # Even loop number
+                    current_src, current_cut = src2, cut2
+                    current_file = self.gcode_file2
+
+                loop_header = (f"; ================ LOOP {loop_num} of {self.loop_count} ================\n"
+                               f"; Using: {current_file}\n\n")
+            else:
+                current_src, current_cut = src, cut
+                loop_header = f"; ================ LOOP {loop_num} of {self.loop_count} ================\n\n"
+
+            yield loop_header.encode('utf-8')
+
+            # Main print GCODE, copied from the source file
+            yield (current_src, current_cut)
+
+            # Push-off sequence (except after the last loop)
+            if loop_num < self.loop_count:
+                trailer = f"; Preparing for loop {loop_num + 1}...\n\n".encode('utf-8')
+                yield b"\n" + push_off_block + trailer
+
+        # Final end GCODE
+        yield b"; ================ FINAL END SEQUENCE ================\n\n" + end_bytes
+
+    def _write_plan(self, out_fd: int, plan) -> None:
+        """Write an output plan to a file descriptor.
+
+        Consecutive literal chunks are gathered into a single writev
+        syscall, so the syscall count scales with the loop count rather
+        than with the number of metadata pieces.
+        """
+        iov: List[bytes] = []
+        for item in plan:
+            if isinstance(item, tuple):
+                self._flush_chunks(out_fd, iov)
+                self._copy_main_body(out_fd, item[0], item[1])
+            else:
+                iov.append(item)
+        self._flush_chunks(out_fd, iov)
+
+    @staticmethod
+    def _flush_chunks(out_fd: int, iov: List[bytes]) -> None:
+        """Submit gathered chunks with one writev, or plain writes without it.
+
+        Like the copy loops in _copy_main_body, retries short writes until
+        every gathered byte is on the descriptor, so a partial count never
+        silently truncates the output.
+        """
+        if not iov:
+            return
+        if hasattr(os, 'writev'):
+            pending = iov
+            while pending:
+                written = os.writev(out_fd, pending)
+                idx = 0
+                while idx < len(pending) and written >= len(pending[idx]):
+                    written -= len(pending[idx])
+                    idx += 1
+                if written:
+                    pending = [pending[idx][written:]] + pending[idx + 1:]
+                else:
+                    pending = pending[idx:]
+        else:
+            for chunk in iov:
+                view = memoryview(chunk)
+                written = 0
+                while written < len(chunk):
+                    written += os.write(out_fd, view[written:])
+        iov.clear()
+
+    def _write_plan_buffer(self, buf, plan) -> None:
+        """Write an output plan into a file-like object instead of a descriptor"""
+        for item in plan:
+            if isinstance(item, tuple):
+                src, length = item
+                src.seek(0)
+                buf.write(src.read(length))
+            else:
+                buf.write(item)
+
+    def _copy_main_body(self, out_fd: int, src, length: int) -> None:
+        """Copy the first `length` bytes of an open source file to the output.
+
+        Uses os.sendfile for an in-kernel zero copy where available, falling
+        back to a chunked read/write loop.
+        """
+        if hasattr(os, 'sendfile'):
+            offset = 0
+            while offset < length:
+                sent = os.sendfile(out_fd, src.fileno(), offset, length - offset)
+                if sent == 0:
+                    # The source shrank since it was split; stopping quietly
+                    # here would truncate the output yet still report success
+                    raise OSError(
+                        f"{src.name} ended after {offset} of {length} bytes")
+                offset += sent
+            return
+
+        # Fallback: mmap the source and hand the kernel zero-copy views of
+        # the main body, so no byte is ever copied into Python memory
+        try:
+            mapped = mmap.mmap(src.fileno(), 0, access=mmap.ACCESS_READ)
+        except (ValueError, OSError):
+            mapped = None
+
+        if mapped is not None:
+            try:
+                if len(mapped) < length:
+                    raise OSError(
+                        f"{src.name} ended after {len(mapped)} of {length} bytes")
+                with memoryview(mapped) as view:
+                    written = 0
+                    while written < length:
+                        written += os.write(out_fd, view[written:length])
+            finally:
+                mapped.close()
+            return
+
+        # Last resort: chunked copy through a single reusable buffer so the
+        # loop allocates no new bytes objects per chunk
+        src.seek(0)
+        buf = bytearray(1 << 20)
+        view = memoryview(buf)
+        remaining = length
+        while remaining > 0:
+            read = src.readinto(view[:min(len(buf), remaining)])
+            if not read:
+                raise OSError(
+                    f"{src.name} ended after {length - remaining} of {length} bytes")
+            os.write(out_fd, view[:read])
+            remaining -= read
+
     def read_gcode(self, filename: str) -> List[str]:
         """Read GCODE file and return lines"""
         try:
-            with open(filename, 'r', encoding='utf-8') as f:
+            # A 1 MiB buffer keeps readlines() from paying one syscall
+            # per default-sized (8 KiB) block on large files
+            with open(filename, 'r', encoding='utf-8', buffering=1 << 20) as f:
                 return f.readlines()
         except Exception as e:
             print(f"\n✗ Error reading file: {e}")
@@ -204,7 +450,7 @@ class PrintLooper:
     def write_gcode(self, filename: str, lines: List[str]) -> bool:
         """Write GCODE lines to file"""
         try:
-            with open(filename, 'w', encoding='utf-8') as f:
+            with open(filename, 'w', encoding='utf-8', buffering=1 << 20) as f:
                 f.writelines(lines)
             return True
         except Exception as e:
@@ -213,19 +459,16 @@ class PrintLooper:
     
     def find_end_gcode_start(self, lines: List[str]) -> int:
         """Find where the end GCODE sequence starts"""
-        # Look for common end GCODE markers
-        for i in range(len(lines) - 1, -1, -1):
-            line = lines[i].strip().upper()
-            # Look for heating off commands or end comments
-            if any(marker in line for marker in [
-                'M104 S0',  # Turn off hotend
-                'M140 S0',  # Turn off bed
-                'M106 S0',  # Turn off fan
-                '; END GCODE',
-                ';END GCODE'
-            ]):
+        # End markers sit near the file tail, so bound the reverse scan
+        # instead of walking every line of a potentially huge file
+        stop = max(0, len(lines) - self._TAIL_SCAN_LINES)
+        for i in range(len(lines) - 1, stop - 1, -1):
+            # Look for heating off commands or end comments; the compiled
+            # case-insensitive pattern replaces strip().upper() plus five
+            # separate substring scans per line
+            if self._END_RE_TEXT.search(lines[i]):
                 return i
-        
+
         # If no end sequence found, return last 20 lines
         return max(0, len(lines) - 20)
     
@@ -239,104 +482,160 @@ class PrintLooper:
         print("Processing GCODE...")
         print("="*50)
         
-        # Read first GCODE file
-        original_lines = self.read_gcode(self.gcode_file)
-        if not original_lines:
+        # Locate the main-body/end-sequence split for the first file; the
+        # main body stays on disk and is copied straight from there below
+        split = self._split_gcode(self.gcode_file)
+        if split is None:
             return None
-        
-        print(f"✓ Read {len(original_lines)} lines from {self.gcode_file}")
-        
-        # Find where end GCODE starts for first file
-        end_gcode_start = self.find_end_gcode_start(original_lines)
-        print(f"✓ File 1 end GCODE sequence starts at line {end_gcode_start + 1}")
-        
-        # Split into main print and end GCODE
-        main_gcode = original_lines[:end_gcode_start]
-        end_gcode = original_lines[end_gcode_start:]
-        
+        cut, end_bytes = split
+        print(f"✓ File 1 main body: {cut} bytes, end sequence: {len(end_bytes)} bytes")
+
         # Handle second file if present
-        main_gcode2 = None
+        cut2 = None
         if self.gcode_file2:
-            original_lines2 = self.read_gcode(self.gcode_file2)
-            if not original_lines2:
+            split2 = self._split_gcode(self.gcode_file2)
+            if split2 is None:
                 return None
-            
-            print(f"✓ Read {len(original_lines2)} lines from {self.gcode_file2}")
-            
-            end_gcode_start2 = self.find_end_gcode_start(original_lines2)
-            print(f"✓ File 2 end GCODE sequence starts at line {end_gcode_start2 + 1}")
-            
-            main_gcode2 = original_lines2[:end_gcode_start2]
-            # We'll use the end_gcode from the first file as the final end
+            # We'll use the end_bytes from the first file as the final end
+            cut2 = split2[0]
+            print(f"✓ File 2 main body: {cut2} bytes")
         
-        # Create output filename
-        base_name = Path(self.gcode_file).stem
-        if self.gcode_file2:
-            base_name2 = Path(self.gcode_file2).stem
-            output_file = f"{base_name}_{base_name2}_alternating_{self.loop_count}x.gcode"
+        # Create output filename (unless one was supplied explicitly)
+        if self.output_file:
+            # Writing over an input would truncate the very bytes the copy
+            # plan is about to read back, destroying the source; the derived
+            # names below can never collide, but an explicit one can
+            out_real = os.path.realpath(self.output_file)
+            for source in (self.gcode_file, self.gcode_file2):
+                if source and os.path.realpath(source) == out_real:
+                    print(f"\n✗ Output file must not overwrite input file: {source}")
+                    return None
+            output_file = self.output_file
         else:
-            output_file = f"{base_name}_looped_{self.loop_count}x.gcode"
-        
-        # Build looped GCODE
-        looped_lines = []
-        
-        # Add header comment
-        looped_lines.append("; ================================================================\n")
-        looped_lines.append(f"; PrintLooper - Looped GCODE for {self.printer_mode}\n")
-        looped_lines.append(f"; Primary file: {self.gcode_file}\n")
-        if self.gcode_file2:
-            looped_lines.append(f"; Secondary file: {self.gcode_file2}\n")
-            looped_lines.append("; Mode: Alternating between files\n")
-        looped_lines.append(f"; Loop count: {self.loop_count}\n")
-        looped_lines.append("; ================================================================\n")
-        looped_lines.append("\n")
-        
-        # Get push-off sequence for selected printer
-        push_off_sequence = self.PUSH_OFF_SEQUENCES[self.printer_mode]
-        
-        # Add each loop
-        for loop_num in range(1, self.loop_count + 1):
-            # Determine which file to use for this loop
+            base_name = os.path.splitext(os.path.basename(self.gcode_file))[0]
             if self.gcode_file2:
-                # Alternate between files: odd loops use file1, even loops use file2
-                if loop_num % 2 == 1:  # Odd loop number
-                    current_gcode = main_gcode
-                    current_file = self.gcode_file
-                else:  # Even loop number
-                    current_gcode = main_gcode2
-                    current_file = self.gcode_file2
-                
-                looped_lines.append(f"; ================ LOOP {loop_num} of {self.loop_count} ================\n")
-                looped_lines.append(f"; Using: {current_file}\n")
-                looped_lines.append("\n")
+                base_name2 = os.path.splitext(os.path.basename(self.gcode_file2))[0]
+                output_file = f"{base_name}_{base_name2}_alternating_{self.loop_count}x.gcode"
             else:
-                current_gcode = main_gcode
-                looped_lines.append(f"; ================ LOOP {loop_num} of {self.loop_count} ================\n")
-                looped_lines.append("\n")
-            
-            # Add main print GCODE
-            looped_lines.extend(current_gcode)
-            
-            # Add push-off sequence (except after the last loop)
-            if loop_num < self.loop_count:
-                looped_lines.append("\n")
-                looped_lines.extend([line + "\n" for line in push_off_sequence])
-                looped_lines.append(f"; Preparing for loop {loop_num + 1}...\n")
-                looped_lines.append("\n")
-        
-        # Add final end GCODE
-        looped_lines.append("; ================ FINAL END SEQUENCE ================\n")
-        looped_lines.append("\n")
-        looped_lines.extend(end_gcode)
+                output_file = f"{base_name}_looped_{self.loop_count}x.gcode"
         
-        # Write output file
-        if self.write_gcode(output_file, looped_lines):
-            print(f"\n✓ Successfully created looped GCODE!")
-            print(f"✓ Output file: {output_file}")
-            print(f"✓ Total lines: {len(looped_lines)}")
-            return output_file
-        else:
+        # Get the pre-joined push-off block for the selected printer
+        push_off_block = self._PUSH_OFF_BLOCKS[self.printer_mode].encode('utf-8')
+
+        # Format the header comment in one pass from the template
+        secondary = self._HEADER_ALT_TMPL % self.gcode_file2 if self.gcode_file2 else ""
+        header = self._HEADER_TMPL % (self.printer_mode, self.gcode_file,
+                                      secondary, self.loop_count)
+
+        # Replicate the main body straight from the source files into the
+        # output; with sendfile the bulk copy never enters Python memory
+        src2 = None
+        try:
+            with open(self.gcode_file, 'rb') as src:
+                if self.gcode_file2:
+                    src2 = open(self.gcode_file2, 'rb')
+
+                # Hint the kernel to read ahead aggressively on the sources
+                if hasattr(os, 'posix_fadvise'):
+                    os.posix_fadvise(src.fileno(), 0, 0, os.POSIX_FADV_SEQUENTIAL)
+                    if src2 is not None:
+                        os.posix_fadvise(src2.fileno(), 0, 0, os.POSIX_FADV_SEQUENTIAL)
+
+                # Assemble the output plan; the list holds only small
+                # metadata chunks and (source, length) copy markers, so
+                # materializing it for exact sizing is cheap
+                plan = list(self._iter_output(header.encode('utf-8'), src, cut,
+                                              src2, cut2, push_off_block, end_bytes))
+
+                total_size = sum(item[1] if isinstance(item, tuple) else len(item)
+                                 for item in plan)
+
+                out_fd = os.open(output_file, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o644)
+                try:
+                    # Reserve the full output in one go so the filesystem
+                    # isn't repeatedly extending the file as loops are written
+                    if hasattr(os, 'posix_fallocate'):
+                        try:
+                            os.posix_fallocate(out_fd, 0, total_size)
+                        except OSError as e:
+                            # Some filesystems don't support fallocate and
+                            # that's fine — but out of space means the run
+                            # can only fail, so stop before streaming the
+                            # whole output
+                            if e.errno == errno.ENOSPC:
+                                raise
+
+                    self._write_plan(out_fd, plan)
+
+                    # The output is written once and then uploaded or copied
+                    # to the printer, so evict it from the page cache rather
+                    # than letting a multi-hundred-MB file crowd out other
+                    # working sets (think OctoPrint on a Raspberry Pi)
+                    if hasattr(os, 'posix_fadvise'):
+                        os.fsync(out_fd)
+                        os.posix_fadvise(out_fd, 0, 0, os.POSIX_FADV_DONTNEED)
+                finally:
+                    os.close(out_fd)
+        except Exception as e:
+            print(f"\n✗ Error writing file: {e}")
+            return None
+        finally:
+            if src2 is not None:
+                src2.close()
+
+        print(f"\n✓ Successfully created looped GCODE!")
+        print(f"✓ Output file: {output_file}")
+        print(f"✓ Output size: {os.path.getsize(output_file) / 1024:.1f} KB")
+        return output_file
+
+    def generate_to_string(self) -> Optional[str]:
+        """Generate the looped GCODE fully in memory and return it as text.
+
+        Produces the same output as create_looped_gcode without touching
+        disk on the write side, for callers (tests, previews) that only
+        inspect the result.
+        """
+        if not self.gcode_file or not self.printer_mode:
+            print("\n✗ Configuration incomplete!")
+            return None
+
+        split = self._split_gcode(self.gcode_file)
+        if split is None:
             return None
+        cut, end_bytes = split
+
+        cut2 = None
+        if self.gcode_file2:
+            split2 = self._split_gcode(self.gcode_file2)
+            if split2 is None:
+                return None
+            # We'll use the end_bytes from the first file as the final end
+            cut2 = split2[0]
+
+        push_off_block = self._PUSH_OFF_BLOCKS[self.printer_mode].encode('utf-8')
+        secondary = self._HEADER_ALT_TMPL % self.gcode_file2 if self.gcode_file2 else ""
+        header = self._HEADER_TMPL % (self.printer_mode, self.gcode_file,
+                                      secondary, self.loop_count)
+
+        buf = io.BytesIO()
+        src2 = None
+        try:
+            with open(self.gcode_file, 'rb') as src:
+                if self.gcode_file2:
+                    src2 = open(self.gcode_file2, 'rb')
+
+                self._write_plan_buffer(buf, self._iter_output(
+                    header.encode('utf-8'), src, cut, src2, cut2,
+                    push_off_block, end_bytes))
+            # Decode inside the try so non-UTF-8 source bytes surface as an
+            # error-and-None like every other failure, not a traceback
+            return buf.getvalue().decode('utf-8')
+        except Exception as e:
+            print(f"\n✗ Error generating GCODE: {e}")
+            return None
+        finally:
+            if src2 is not None:
+                src2.close()
     
     def run(self):
         """Main execution flow"""
@@ -387,9 +686,53 @@ class PrintLooper:
             sys.exit(1)
 
 
+def _parse_args(argv: List[str]) -> argparse.Namespace:
+    """Parse command-line arguments for non-interactive use"""
+    parser = argparse.ArgumentParser(
+        prog="printlooper",
+        description="Automate multiple 3D prints by looping GCODE files")
+    parser.add_argument('--printer', required=True,
+                        help="printer mode: menu number (1-2) or full name")
+    parser.add_argument('--file', required=True,
+                        help="GCODE file to loop")
+    parser.add_argument('--file2',
+                        help="optional second GCODE file to alternate with")
+    parser.add_argument('--loops', type=int, default=1,
+                        help="number of loops, 1-99 (default: 1)")
+    parser.add_argument('--output',
+                        help="output filename (default: derived from the inputs)")
+
+    args = parser.parse_args(argv)
+
+    printer = PrintLooper.PRINTER_MODES.get(args.printer, args.printer)
+    if printer not in PrintLooper.PRINTER_MODES.values():
+        parser.error(f"unknown printer: {args.printer}")
+    args.printer = printer
+
+    if not 1 <= args.loops <= 99:
+        parser.error("--loops must be between 1 and 99")
+
+    return args
+
+
 def main():
     """Entry point"""
     looper = PrintLooper()
+
+    if len(sys.argv) > 1:
+        # Non-interactive mode: everything supplied on the command line, so
+        # batch runs can be scripted (and parallelized) without prompts
+        args = _parse_args(sys.argv[1:])
+        looper.printer_mode = args.printer
+        looper.gcode_file = args.file
+        looper.gcode_file2 = args.file2
+        looper.loop_count = args.loops
+        looper.output_file = args.output
+
+        if looper.create_looped_gcode() is None:
+            sys.exit(1)
+        return
+
     looper.run()
 
 